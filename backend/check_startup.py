@@ -0,0 +1,87 @@
+"""
+Startup-time regression check for the OSINT Vision API
+
+Imports main.py in a fresh interpreter (warm-up disabled) and fails if:
+- a heavy module (cv2, numpy, PIL, exifread, geopy) is imported eagerly
+- the import takes longer than the budget
+
+Then reports the import time of each lazy subsystem, each in its own
+fresh interpreter so the numbers do not hide each other's shared imports.
+
+Usage (from backend/):
+    python check_startup.py [--budget-ms 1500]
+
+tests/test_startup.py runs it as part of the test suite.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import List, Optional
+
+HEAVY_MODULES = ["cv2", "numpy", "PIL", "exifread", "geopy"]
+
+MAIN_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = (time.perf_counter() - start) * 1000
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"ms": elapsed, "heavy": heavy}}))
+"""
+
+SUBSYSTEM_PROBE = """
+import json
+from services import subsystems
+subsystems.load({name!r})
+print(json.dumps(subsystems.timings()[{name!r}]))
+"""
+
+
+def run_probe(code: str) -> object:
+    """Run a probe in a fresh interpreter from the backend directory and parse its JSON output."""
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, OSINT_WARM_SUBSYSTEMS="0")
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=backend_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check API cold-start import time")
+    parser.add_argument("--budget-ms", type=float, default=1500.0,
+                        help="Maximum allowed time to import main.py (default 1500)")
+    args = parser.parse_args(argv)
+
+    from services.subsystems import SUBSYSTEMS
+
+    result = run_probe(MAIN_PROBE.format(heavy=HEAVY_MODULES))
+    print(f"import main: {result['ms']:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    for name in SUBSYSTEMS:
+        ms = run_probe(SUBSYSTEM_PROBE.format(name=name))
+        print(f"  subsystem {name:<9} {ms} ms")
+
+    failed = False
+    if result["heavy"]:
+        print(f"✗ Heavy modules imported eagerly: {', '.join(result['heavy'])}")
+        failed = True
+    if result["ms"] > args.budget_ms:
+        print(f"✗ Cold start over budget by {result['ms'] - args.budget_ms:.1f} ms")
+        failed = True
+
+    if not failed:
+        print("✓ Startup check passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,379 @@
+"""
+Offline Bulk Ingest - Location Pipeline over Directories and Archives
+Runs the location pipeline without HTTP for triage of disk images
+
+PIPELINE (per file, same priority as /analyze/location minus IP):
+1. extract_exif_coordinates → confidence="high", source="EXIF"
+   (+ reverse_geocode when --geocode is given)
+2. infer_from_ocr on a sidecar text file → confidence="medium", source="OCR"
+3. All fail → confidence="low", source="none"
+
+OCR sidecars are "<image stem>.txt" next to the image, for directories and
+zip archives (tar archives are read as a stream, so sidecars are skipped).
+
+OUTPUT:
+Records are written in bounded chunks to <out>/part-00000.jsonl (or
+.parquet, requires pyarrow). After each chunk <out>/checkpoint.json stores
+how many files are done, so a rerun with --resume continues from there
+(skipped entries are not read). Unreadable files, archive members or
+archives become rows with "error" set instead of aborting the run.
+Archive bytes held for queued tasks are capped by --max-in-flight-mb.
+
+Usage (from backend/):
+    python ingest.py /mnt/evidence dump.tar.gz --out results/ --workers 8
+    python ingest.py /mnt/evidence --out results/ --format parquet --resume
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import tarfile
+import time
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, List, Optional, Tuple
+
+# Try to import pyarrow, only needed for --format parquet
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Same types accepted by /analyze/location
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".tif", ".tiff", ".webp"}
+ARCHIVE_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz", ".zip")
+CHECKPOINT_FILE = "checkpoint.json"
+
+# Item sent to a worker: (path, image bytes or None to read path, OCR text, read error)
+Item = Tuple[str, Optional[bytes], Optional[str], Optional[str]]
+# Entry yielded while walking inputs: (path, loader returning the Item).
+# Loaders are called in walk order before the walk advances, so resuming
+# can skip entries without reading their data.
+Entry = Tuple[str, Callable[[], Item]]
+
+# Errors raised while reading an archive or one of its members. zipfile
+# raises NotImplementedError for unsupported compression (e.g. Deflate64
+# from Windows Explorer) and RuntimeError for encrypted members.
+READ_ERRORS = (OSError, EOFError, zipfile.BadZipFile, tarfile.TarError, zlib.error,
+               NotImplementedError, RuntimeError)
+
+
+def is_image(name: str) -> bool:
+    return os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+
+
+def sidecar_name(name: str) -> str:
+    return os.path.splitext(name)[0] + ".txt"
+
+
+def _failed(path: str, error: Exception) -> Entry:
+    return (path, lambda: (path, None, None, f"{type(error).__name__}: {error}"))
+
+
+def walk_directory(root: str) -> Iterator[Entry]:
+    """Yield images under a directory in a stable (sorted) order."""
+    def loader(path: str, sidecar: Optional[str]) -> Callable[[], Item]:
+        def load() -> Item:
+            ocr_text = None
+            if sidecar:
+                with open(sidecar, encoding="utf-8", errors="replace") as f:
+                    ocr_text = f.read()
+            return (path, None, ocr_text, None)
+        return load
+
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        names = set(filenames)
+        for filename in sorted(filenames):
+            if not is_image(filename):
+                continue
+            sidecar = sidecar_name(filename)
+            sidecar_path = os.path.join(dirpath, sidecar) if sidecar in names else None
+            path = os.path.join(dirpath, filename)
+            yield (path, loader(path, sidecar_path))
+
+
+def walk_zip(archive: str) -> Iterator[Entry]:
+    """Yield images from a zip archive in member order."""
+    def loader(zf: zipfile.ZipFile, info: zipfile.ZipInfo, path: str, sidecar: Optional[str]) -> Callable[[], Item]:
+        def load() -> Item:
+            ocr_text = None
+            if sidecar:
+                ocr_text = zf.read(sidecar).decode("utf-8", errors="replace")
+            return (path, zf.read(info), ocr_text, None)
+        return load
+
+    try:
+        with zipfile.ZipFile(archive) as zf:
+            names = set(zf.namelist())
+            for info in zf.infolist():
+                if info.is_dir() or not is_image(info.filename):
+                    continue
+                sidecar = sidecar_name(info.filename)
+                path = f"{archive}!{info.filename}"
+                yield (path, loader(zf, info, path, sidecar if sidecar in names else None))
+    except READ_ERRORS as e:
+        yield _failed(archive, e)
+
+
+def walk_tar(archive: str) -> Iterator[Entry]:
+    """Yield images from a (possibly compressed) tar archive as a stream."""
+    def loader(tf: tarfile.TarFile, member: tarfile.TarInfo, path: str) -> Callable[[], Item]:
+        return lambda: (path, tf.extractfile(member).read(), None, None)
+
+    try:
+        with tarfile.open(archive, "r|*") as tf:
+            for member in tf:
+                if not member.isfile() or not is_image(member.name):
+                    continue
+                path = f"{archive}!{member.name}"
+                yield (path, loader(tf, member, path))
+    except READ_ERRORS as e:
+        # A broken stream ends the archive; the rest of its members are lost
+        yield _failed(archive, e)
+
+
+def iter_inputs(inputs: List[str]) -> Iterator[Entry]:
+    """Yield every image from the given directories, archives and files."""
+    for path in inputs:
+        if os.path.isdir(path):
+            yield from walk_directory(path)
+        elif path.lower().endswith(".zip"):
+            yield from walk_zip(path)
+        elif path.lower().endswith(ARCHIVE_SUFFIXES):
+            yield from walk_tar(path)
+        elif is_image(path):
+            yield (path, lambda path=path: (path, None, None, None))
+        else:
+            print(f"Skipping unsupported input: {path}", file=sys.stderr)
+
+
+def load_entry(entry: Entry) -> Item:
+    """Read an entry's data, turning read errors into an error item instead of aborting the run."""
+    path, load = entry
+    try:
+        return load()
+    except READ_ERRORS as e:
+        return (path, None, None, f"{type(e).__name__}: {e}")
+
+
+def init_worker(geocode: bool) -> None:
+    """Import the EXIF stack (and geopy) once per worker process."""
+    from services import subsystems
+    subsystems.load("exif")
+    if geocode:
+        subsystems.load("geocoder")
+
+
+def process_file(item: Item, geocode: bool) -> dict:
+    """Run the location pipeline on a single file."""
+    from services.location import extract_exif_coordinates, infer_from_ocr, reverse_geocode
+
+    path, data, ocr_text, error = item
+    location = {
+        "latitude": None,
+        "longitude": None,
+        "city": None,
+        "country": None,
+        "confidence": "low",
+        "source": "none"
+    }
+
+    if error:
+        return {"path": path, "location": location, "error": error}
+
+    try:
+        if data is None:
+            with open(path, "rb") as f:
+                lat, lon = extract_exif_coordinates(f)
+        else:
+            lat, lon = extract_exif_coordinates(io.BytesIO(data))
+
+        if lat is not None and lon is not None:
+            city, country = reverse_geocode(lat, lon) if geocode else (None, None)
+            location.update(latitude=lat, longitude=lon, city=city, country=country,
+                            confidence="high", source="EXIF")
+        elif ocr_text:
+            lat, lon, city, country = infer_from_ocr(ocr_text)
+            if lat is not None and lon is not None:
+                location.update(latitude=lat, longitude=lon, city=city, country=country,
+                                confidence="medium", source="OCR")
+    except Exception as e:
+        return {"path": path, "location": location, "error": str(e)}
+
+    return {"path": path, "location": location, "error": None}
+
+
+def process_batch(items: List[Item], geocode: bool) -> List[dict]:
+    return [process_file(item, geocode) for item in items]
+
+
+class ChunkWriter:
+    """Buffers records and writes them out as numbered part files with a checkpoint."""
+
+    def __init__(self, out_dir: str, fmt: str, chunk_size: int, processed: int, parts: int, inputs: List[str]):
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.chunk_size = chunk_size
+        self.processed = processed
+        self.parts = parts
+        self.inputs = inputs
+        self.buffer: List[dict] = []
+
+    def add(self, records: List[dict]) -> None:
+        for record in records:
+            self.buffer.append(record)
+            if len(self.buffer) >= self.chunk_size:
+                self.flush()
+
+    def flush(self) -> None:
+        if not self.buffer:
+            return
+
+        path = os.path.join(self.out_dir, f"part-{self.parts:05d}.{self.fmt}")
+        tmp_path = path + ".tmp"
+        if self.fmt == "parquet":
+            pq.write_table(pa.Table.from_pylist(self.buffer, schema=parquet_schema()), tmp_path)
+        else:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for record in self.buffer:
+                    f.write(json.dumps(record) + "\n")
+        os.replace(tmp_path, path)
+
+        self.processed += len(self.buffer)
+        self.parts += 1
+        self.buffer = []
+        self.save_checkpoint()
+
+    def save_checkpoint(self) -> None:
+        checkpoint = {"inputs": self.inputs, "processed": self.processed, "parts": self.parts}
+        tmp_path = os.path.join(self.out_dir, CHECKPOINT_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, os.path.join(self.out_dir, CHECKPOINT_FILE))
+
+
+def parquet_schema() -> "pa.Schema":
+    return pa.schema([
+        ("path", pa.string()),
+        ("location", pa.struct([
+            ("latitude", pa.float64()),
+            ("longitude", pa.float64()),
+            ("city", pa.string()),
+            ("country", pa.string()),
+            ("confidence", pa.string()),
+            ("source", pa.string()),
+        ])),
+        ("error", pa.string()),
+    ])
+
+
+def load_checkpoint(out_dir: str, inputs: List[str]) -> Tuple[int, int]:
+    """Return (files already processed, next part number) from a previous run."""
+    path = os.path.join(out_dir, CHECKPOINT_FILE)
+    if not os.path.exists(path):
+        return (0, 0)
+
+    with open(path, encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("inputs") != inputs:
+        raise SystemExit("Checkpoint was written for different inputs; use a new --out directory")
+    return (checkpoint["processed"], checkpoint["parts"])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk EXIF/GPS location extraction")
+    parser.add_argument("inputs", nargs="+", help="Directories, tar/zip archives or image files")
+    parser.add_argument("--out", required=True, help="Output directory for part files and checkpoint")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Records per part file")
+    parser.add_argument("--batch-size", type=int, default=64, help="Files per worker task")
+    parser.add_argument("--max-in-flight-mb", type=int, default=512,
+                        help="Cap on archive bytes held for queued/running tasks (default 512)")
+    parser.add_argument("--resume", action="store_true", help="Continue from checkpoint.json in --out")
+    parser.add_argument("--geocode", action="store_true",
+                        help="Reverse geocode EXIF hits via Nominatim (rate limited, slow)")
+    args = parser.parse_args(argv)
+
+    if args.format == "parquet" and not PYARROW_AVAILABLE:
+        print("--format parquet requires pyarrow (pip install pyarrow)", file=sys.stderr)
+        return 1
+
+    inputs = [os.path.abspath(p) for p in args.inputs]
+    os.makedirs(args.out, exist_ok=True)
+
+    processed, parts = load_checkpoint(args.out, inputs) if args.resume else (0, 0)
+    if processed:
+        print(f"Resuming after {processed} files ({parts} parts written)")
+
+    writer = ChunkWriter(args.out, args.format, args.chunk_size, processed, parts, inputs)
+    entries = iter_inputs(inputs)
+    for _ in range(processed):
+        next(entries, None)
+
+    # Results are consumed in submission order so the checkpoint count
+    # always refers to a prefix of the (deterministic) input order.
+    # In-flight work is capped both by batch count and by the archive
+    # bytes the main process holds for it.
+    max_in_flight = args.workers * 4
+    max_bytes = args.max_in_flight_mb * 1024 * 1024
+    batch_max_bytes = max(1, max_bytes // max_in_flight)
+    pending = deque()
+    in_flight_bytes = 0
+    done = 0
+    start = time.perf_counter()
+    last_report = start
+
+    def drain_one() -> None:
+        nonlocal in_flight_bytes, done
+        future, size = pending.popleft()
+        records = future.result()
+        in_flight_bytes -= size
+        writer.add(records)
+        done += len(records)
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker,
+                             initargs=(args.geocode,)) as pool:
+        def submit(batch: List[Item], size: int) -> None:
+            nonlocal in_flight_bytes
+            while pending and (len(pending) >= max_in_flight or in_flight_bytes + size > max_bytes):
+                drain_one()
+            pending.append((pool.submit(process_batch, batch, args.geocode), size))
+            in_flight_bytes += size
+
+        batch, batch_bytes = [], 0
+        for entry in entries:
+            item = load_entry(entry)
+            batch.append(item)
+            batch_bytes += len(item[1] or b"")
+            if len(batch) >= args.batch_size or batch_bytes >= batch_max_bytes:
+                submit(batch, batch_bytes)
+                batch, batch_bytes = [], 0
+
+            now = time.perf_counter()
+            if now - last_report >= 5:
+                print(f"{done} files, {done / (now - start):.1f} files/sec", file=sys.stderr)
+                last_report = now
+
+        if batch:
+            submit(batch, batch_bytes)
+        while pending:
+            drain_one()
+
+    writer.flush()
+    elapsed = time.perf_counter() - start
+    rate = done / elapsed if elapsed > 0 else 0.0
+    print(f"✓ {done} files in {elapsed:.1f}s ({rate:.1f} files/sec), "
+          f"{writer.processed} total in {writer.parts} parts")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -26,23 +26,17 @@ OUTPUT FORMAT (MUST MATCH EXACTLY):
 }
 """
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
-from typing import Optional
-import cv2
-import numpy as np
+from typing import List, Optional
 
-from services.location import analyze_location
-from services.human_detection import analyze_human_detection, load_model, CONFIDENCE_THRESHOLD
-
-# Import geopy for reverse geocoding
-try:
-    from geopy.geocoders import Nominatim
-    from geopy.exc import GeocoderTimedOut, GeocoderServiceError
-    GEOPY_AVAILABLE = True
-except ImportError:
-    GEOPY_AVAILABLE = False
+# Heavy subsystems (OpenCV/DNN, EXIF stack, geopy) are imported on first use
+# or warmed in the background after startup - see services/subsystems.py
+from services import profiling, subsystems
+# Profiling-aware drop-in for fastapi.concurrency.run_in_threadpool
+from services.profiling import run_in_threadpool
 
 
 app = FastAPI(
@@ -58,6 +52,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in per-request profiling; passes requests straight through when off
+app.add_middleware(profiling.ProfilingMiddleware)
+
+
+@app.on_event("startup")
+async def warm_subsystems():
+    """Warm heavy subsystems in the background once the server is accepting traffic."""
+    subsystems.start_background_warmup()
+
+
+async def ensure_subsystem(name: str) -> bool:
+    """
+    Load a subsystem without blocking the event loop.
+
+    The first import of cv2/PIL/geopy can take seconds (or wait on the
+    warm-up thread), so it runs in the threadpool; /health and other
+    requests keep being served meanwhile.
+    """
+    if subsystems.is_loaded(name):
+        return True
+    return await run_in_threadpool(subsystems.load, name)
+
 
 # Request model for analyze/location endpoint
 class LocationAnalyzeRequest(BaseModel):
@@ -114,6 +130,8 @@ async def analyze_location_endpoint(
         )
     
     # Analyze the image and return location data
+    await ensure_subsystem("exif")
+    from services.location import analyze_location
     result = analyze_location(file, ocr_text, ip_address)
     
     return LocationResponse(**result)
@@ -122,7 +140,11 @@ async def analyze_location_endpoint(
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "service": "osint-location-api"}
+    return {
+        "status": "healthy",
+        "service": "osint-location-api",
+        "subsystemImportMs": subsystems.timings()
+    }
 
 
 @app.get("/")
@@ -137,12 +159,43 @@ async def root():
         "endpoints": {
             "POST /analyze/location": "Analyze image for location intelligence",
             "POST /api/location": "Verify GPS coordinates against Indian location database",
+            "POST /analyze/manipulation": "JPEG ghost and quantization analysis",
             "GET /health": "Health check"
         },
         "location_priority": ["EXIF", "OCR", "IP", "none"]
     }
 
 
+def require_admin(token: Optional[str]) -> None:
+    if not profiling.is_admin(token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+@app.get("/admin/profiles")
+async def list_profiles(x_admin_token: Optional[str] = Header(None)):
+    """List saved request profiles, newest first (requires X-Admin-Token)."""
+    require_admin(x_admin_token)
+    return {"profiles": profiling.list_profiles()}
+
+
+@app.get("/admin/profiles/{profile_id}")
+async def download_profile(profile_id: str, x_admin_token: Optional[str] = Header(None)):
+    """Download a saved profile in pstats format (requires X-Admin-Token)."""
+    require_admin(x_admin_token)
+    path = profiling.profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
+
+
+async def lookup_altitude(lat: float, lon: float) -> Optional[float]:
+    """Altitude in meters from local DEM tiles, or None if not covered."""
+    if not await ensure_subsystem("elevation"):
+        return None
+    from services.elevation import get_elevation
+    return get_elevation(lat, lon)
+
+
 # Request model for direct GPS coordinate verification
 class GpsVerifyRequest(BaseModel):
     """Request model for GPS coordinate verification."""
@@ -154,7 +207,7 @@ class GpsVerifyRequest(BaseModel):
 class LocationInfoResponse(BaseModel):
     """Response model with full location information."""
     city: str
-    altitude: float
+    altitude: Optional[float] = None
     accuracy: str
 
 
@@ -169,7 +222,7 @@ async def get_location(data: GpsVerifyRequest):
     
     OUTPUT:
     - city: "City name" or "Unknown location"
-    - altitude: float (estimated altitude in meters)
+    - altitude: float (meters, from local DEM tiles) or null if no tile covers the point
     - accuracy: "High (±5m)", "Medium (±10m)", "Low (±50m)", or "Unknown"
     
     Returns:
@@ -185,11 +238,11 @@ async def get_location(data: GpsVerifyRequest):
         raise HTTPException(status_code=400, detail="Longitude must be between -180 and 180")
     
     city = "Unknown location"
-    altitude = 0.0
     accuracy = "Unknown"
     
     # Reverse geocode to get city name
-    if GEOPY_AVAILABLE:
+    if await ensure_subsystem("geocoder"):
+        from geopy.geocoders import Nominatim
         try:
             geolocator = Nominatim(user_agent="osint_app", timeout=5)
             location = geolocator.reverse((lat, lon), exactly_one=True)
@@ -206,14 +259,7 @@ async def get_location(data: GpsVerifyRequest):
         except Exception as e:
             print(f"Geocoding error: {e}")
     
-    # Estimate altitude based on latitude (rough approximation)
-    # Real altitude would require elevation API or GPS data
-    # This is a simplified estimation based on general geographic patterns
-    if lat is not None and lon is not None:
-        # Base altitude estimation using latitude-based patterns
-        # (This is a simplified approximation for demonstration)
-        base_altitude = abs(lat) * 10 + abs(lon) * 5  # Rough estimation
-        altitude = round(base_altitude, 1)
+    altitude = await lookup_altitude(lat, lon)
     
     # Determine accuracy based on coordinate precision
     # Nominatim typically provides accuracy around city/street level
@@ -236,7 +282,7 @@ async def verify_location(lat: float, lon: float):
     
     Returns:
     - city: string
-    - altitude: float
+    - altitude: float or null
     - accuracy: string
     """
     # Validate coordinates
@@ -246,11 +292,11 @@ async def verify_location(lat: float, lon: float):
         raise HTTPException(status_code=400, detail="Longitude must be between -180 and 180")
     
     city = "Unknown location"
-    altitude = 0.0
     accuracy = "Unknown"
     
     # Reverse geocode to get city name
-    if GEOPY_AVAILABLE:
+    if await ensure_subsystem("geocoder"):
+        from geopy.geocoders import Nominatim
         try:
             geolocator = Nominatim(user_agent="osint_app", timeout=5)
             location = geolocator.reverse((lat, lon), exactly_one=True)
@@ -267,10 +313,7 @@ async def verify_location(lat: float, lon: float):
         except Exception as e:
             print(f"Geocoding error: {e}")
     
-    # Estimate altitude based on coordinates
-    if lat is not None and lon is not None:
-        base_altitude = abs(lat) * 10 + abs(lon) * 5
-        altitude = round(base_altitude, 1)
+    altitude = await lookup_altitude(lat, lon)
     
     # Determine accuracy
     if city and city != "Unknown location":
@@ -281,6 +324,28 @@ async def verify_location(lat: float, lon: float):
     return {"city": city, "altitude": altitude, "accuracy": accuracy}
 
 
+async def decode_image(file: UploadFile, ignore_orientation: bool = False):
+    """
+    Decode an uploaded image to a BGR array, shared by the vision endpoints.
+
+    ignore_orientation keeps the stored pixel layout instead of applying the
+    EXIF rotation, which would move the 8x8 JPEG grid off its origin.
+    """
+    import cv2
+    import numpy as np
+
+    contents = await file.read()
+    nparr = np.frombuffer(contents, np.uint8)
+    flags = cv2.IMREAD_COLOR
+    if ignore_orientation:
+        flags |= cv2.IMREAD_IGNORE_ORIENTATION
+    image = await run_in_threadpool(cv2.imdecode, nparr, flags)
+    
+    if image is None:
+        raise HTTPException(status_code=400, detail="Invalid image file")
+    return image
+
+
 class HumanDetectionResponse(BaseModel):
     humanDetected: bool
     humanCount: int
@@ -306,17 +371,49 @@ async def human_detection_endpoint(
         "confidence": number
     }
     """
-    contents = await file.read()
-    nparr = np.frombuffer(contents, np.uint8)
-    image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    await ensure_subsystem("vision")
+    from services.human_detection import analyze_human_detection, load_model
+
+    image = await decode_image(file)
+    net = await run_in_threadpool(load_model)
+    result = await run_in_threadpool(analyze_human_detection, image, net, confidence)
     
-    if image is None:
-        raise HTTPException(status_code=400, detail="Invalid image file")
+    return HumanDetectionResponse(**result)
+
+
+class ManipulationResponse(BaseModel):
+    manipulationScore: float
+    elaScore: float
+    quantizationScore: float
+    heatmap: List[List[int]]
+
+
+@app.post("/analyze/manipulation", response_model=ManipulationResponse)
+async def manipulation_endpoint(
+    file: UploadFile = File(..., description="Image file for manipulation analysis")
+):
+    """
+    Check an image for signs of editing using JPEG ghosts (error-level
+    analysis across qualities) and JPEG block quantization consistency.
     
-    net = load_model()
-    result = analyze_human_detection(image, net, confidence)
+    INPUT:
+    - Image file (required): multipart/form-data
     
-    return HumanDetectionResponse(**result)
+    OUTPUT:
+    {
+        "manipulationScore": number (0-1, strength of the most inconsistent region),
+        "elaScore": number,
+        "quantizationScore": number,
+        "heatmap": number[][] (up to 32x32 JPEG ghost grid, 0-255)
+    }
+    """
+    await ensure_subsystem("vision")
+    from services.manipulation import analyze_manipulation
+
+    image = await decode_image(file, ignore_orientation=True)
+    result = await run_in_threadpool(analyze_manipulation, image)
+    
+    return ManipulationResponse(**result)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,180 @@
+"""
+Elevation Lookup Module
+Altitude from local SRTM-style DEM tiles, no external elevation API
+
+TILES:
+- One file per 1°x1° cell in DEM_DIR, named after its south-west corner,
+  e.g. N28E077.hgt covers lat 28..29, lon 77..78
+- Square grid of big-endian int16 metres, 1201x1201 (SRTM3, 3") or
+  3601x3601 (SRTM1, 1"); row 0 is the northern edge, -32768 marks voids
+
+Tiles are opened with numpy.memmap on first use and kept in an LRU of at
+most MAX_OPEN_TILES, so only the pages actually sampled are read and
+memory stays bounded even with global coverage on disk. Missing tiles are
+remembered separately for MISSING_TILE_TTL seconds, so lookups over the
+ocean don't hit the filesystem every time, don't evict open tiles, and
+tiles added to DEM_DIR later are picked up. Heights are bilinearly
+interpolated between the four surrounding samples.
+"""
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+DEM_DIR = os.environ.get("OSINT_DEM_DIR", "dem")
+MAX_OPEN_TILES = int(os.environ.get("OSINT_DEM_MAX_OPEN_TILES", "16"))
+MISSING_TILE_TTL = float(os.environ.get("OSINT_DEM_MISSING_TTL", "60"))
+VOID = -32768
+
+_lock = threading.Lock()
+# (lat_floor, lon_floor) → memmap of an open tile
+_tiles: "OrderedDict[tuple, np.memmap]" = OrderedDict()
+# (lat_floor, lon_floor) → time.monotonic() after which to look on disk again
+_missing: Dict[tuple, float] = {}
+
+
+def tile_name(lat_floor: int, lon_floor: int) -> str:
+    """Return the SRTM file name of the tile whose south-west corner is given."""
+    ns = "N" if lat_floor >= 0 else "S"
+    ew = "E" if lon_floor >= 0 else "W"
+    return f"{ns}{abs(lat_floor):02d}{ew}{abs(lon_floor):03d}.hgt"
+
+
+def _open_tile(lat_floor: int, lon_floor: int) -> Optional[np.memmap]:
+    path = os.path.join(DEM_DIR, tile_name(lat_floor, lon_floor))
+    if not os.path.exists(path):
+        return None
+
+    file_size = os.path.getsize(path)
+    size = math.isqrt(file_size // 2)
+    if size < 2 or size * size * 2 != file_size:
+        print(f"Ignoring malformed DEM tile: {path}")
+        return None
+    return np.memmap(path, dtype=">i2", mode="r", shape=(size, size))
+
+
+def get_tile(lat_floor: int, lon_floor: int) -> Optional[np.memmap]:
+    """Return the memory-mapped tile, opening it and evicting the least recently used if needed."""
+    key = (lat_floor, lon_floor)
+    with _lock:
+        if key in _tiles:
+            _tiles.move_to_end(key)
+            return _tiles[key]
+        if _missing.get(key, 0.0) > time.monotonic():
+            return None
+
+        tile = _open_tile(lat_floor, lon_floor)
+        if tile is None:
+            _missing[key] = time.monotonic() + MISSING_TILE_TTL
+            return None
+
+        _missing.pop(key, None)
+        _tiles[key] = tile
+        while len(_tiles) > MAX_OPEN_TILES:
+            _tiles.popitem(last=False)
+        return tile
+
+
+def _sample(tile: np.ndarray, lat: np.ndarray, lon: np.ndarray, lat_floor: int, lon_floor: int) -> np.ndarray:
+    """Bilinearly interpolate a tile at many points (NaN where all neighbours are void)."""
+    n = tile.shape[0] - 1
+    row = (lat_floor + 1 - lat) * n
+    col = (lon - lon_floor) * n
+    r0 = np.clip(np.floor(row).astype(np.intp), 0, n - 1)
+    c0 = np.clip(np.floor(col).astype(np.intp), 0, n - 1)
+    dr = (row - r0)[:, None]
+    dc = (col - c0)[:, None]
+
+    # Neighbours in order: top-left, top-right, bottom-left, bottom-right
+    heights = np.stack([
+        tile[r0, c0], tile[r0, c0 + 1], tile[r0 + 1, c0], tile[r0 + 1, c0 + 1]
+    ], axis=1).astype(np.float64)
+    weights = np.concatenate([(1 - dr) * (1 - dc), (1 - dr) * dc, dr * (1 - dc), dr * dc], axis=1)
+
+    # Drop void samples and renormalize over the remaining neighbours; a point
+    # sitting exactly on a void sample falls back to the mean of the others
+    valid = heights != VOID
+    weights[~valid] = 0.0
+    total = weights.sum(axis=1)
+    weights = np.where((total > 0)[:, None], weights, valid.astype(np.float64))
+    total = weights.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, (heights * weights).sum(axis=1) / total, np.nan)
+
+
+def _fill(result: np.ndarray, mask: np.ndarray, lats: np.ndarray, lons: np.ndarray,
+          lat_floors: np.ndarray, lon_floors: np.ndarray) -> None:
+    """Sample the masked points from the given tiles, grouping them so each tile is fetched once."""
+    indices = np.flatnonzero(mask)
+    keys = np.stack([lat_floors[indices], lon_floors[indices]], axis=1)
+    unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    for i, (lat_floor, lon_floor) in enumerate(unique_keys):
+        tile = get_tile(int(lat_floor), int(lon_floor))
+        if tile is None:
+            continue
+        group = indices[inverse == i]
+        result[group] = _sample(tile, lats[group], lons[group], int(lat_floor), int(lon_floor))
+
+
+def get_elevations(lats: Sequence[float], lons: Sequence[float]) -> np.ndarray:
+    """
+    Batched elevation lookup.
+
+    Points are grouped by tile so each tile is fetched once and sampled
+    with vectorized indexing.
+
+    Args:
+        lats: Latitudes in degrees
+        lons: Longitudes in degrees
+
+    Returns:
+        Array of elevations in metres, NaN where no tile or data is available
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    result = np.full(lats.shape, np.nan)
+    if lats.size == 0:
+        return result
+
+    lat_floors = np.floor(lats).astype(np.int64)
+    lon_floors = np.floor(lons).astype(np.int64)
+    # lat=90 / lon=180 belong to the tile below / to the left
+    lat_floors = np.minimum(lat_floors, 89)
+    lon_floors = np.minimum(lon_floors, 179)
+
+    # A point on a whole degree is also the top row / last column of the
+    # tile to the south / west; use that one if its own tile has no data
+    on_lat_edge = (lats == lat_floors) & (lat_floors > -90)
+    on_lon_edge = (lons == lon_floors) & (lon_floors > -180)
+    for lat_shift, lon_shift in ((0, 0), (1, 0), (0, 1), (1, 1)):
+        todo = np.isnan(result)
+        if lat_shift:
+            todo &= on_lat_edge
+        if lon_shift:
+            todo &= on_lon_edge
+        if todo.any():
+            _fill(result, todo, lats, lons, lat_floors - lat_shift, lon_floors - lon_shift)
+    return result
+
+
+def get_elevation(lat: float, lon: float) -> Optional[float]:
+    """
+    Look up the elevation of a single point.
+
+    Args:
+        lat: Latitude in degrees
+        lon: Longitude in degrees
+
+    Returns:
+        Elevation in metres rounded to 0.1, or None if no DEM data covers the point
+    """
+    value = get_elevations([lat], [lon])[0]
+    if np.isnan(value):
+        return None
+    return round(float(value), 1)
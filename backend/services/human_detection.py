@@ -1,5 +1,7 @@
 import cv2
 import numpy as np
+import threading
+from functools import lru_cache
 from typing import Tuple, Optional
 
 CONFIDENCE_THRESHOLD = 0.5
@@ -7,14 +9,19 @@ MODEL_DIR = "models"
 PROTOTXT = f"{MODEL_DIR}/deploy.prototxt"
 CAFFEMODEL = f"{MODEL_DIR}/MobileNetSSD_deploy.caffemodel"
 
+# The cached net is shared by threadpool workers; setInput/forward is not thread-safe
+_NET_LOCK = threading.Lock()
+
+@lru_cache(maxsize=1)
 def load_model() -> cv2.dnn.Net:
     return cv2.dnn.readNetFromCaffe(PROTOTXT, CAFFEMODEL)
 
 def detect_humans(image: np.ndarray, net: cv2.dnn.Net, confidence_threshold: float = CONFIDENCE_THRESHOLD) -> Tuple[bool, int, str, Optional[float]]:
     (h, w) = image.shape[:2]
     blob = cv2.dnn.blobFromImage(cv2.resize(image, (300, 300)), 0.007843, (300, 300), 127.5)
-    net.setInput(blob)
-    detections = net.forward()
+    with _NET_LOCK:
+        net.setInput(blob)
+        detections = net.forward()
     human_count = 0
     max_confidence = 0.0
 
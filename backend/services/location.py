@@ -12,10 +12,13 @@ No ML models used - deterministic, conservative approach.
 """
 
 import re
+from functools import lru_cache
 from io import BytesIO
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 from PIL import Image
 
+from services.place_index import PlaceIndex
+
 # Try to import exifread, handle gracefully if not available
 try:
     import exifread
@@ -23,13 +26,8 @@ try:
 except ImportError:
     EXIFREAD_AVAILABLE = False
 
-# Try to import geopy, handle gracefully if not available
-try:
-    from geopy.geocoders import Nominatim
-    from geopy.exc import GeocoderTimedOut, GeocoderServiceError
-    GEOPY_AVAILABLE = True
-except ImportError:
-    GEOPY_AVAILABLE = False
+# geopy is loaded lazily on first reverse geocode (see services/subsystems.py)
+from services import subsystems
 
 # Common place names for OCR-based inference (no ML - simple keyword matching)
 # Indian cities and landmarks for OSINT inference
@@ -110,9 +108,9 @@ def extract_exif_coordinates(image_file) -> Tuple[Optional[float], Optional[floa
             gps_lon = None
             
             # GPSLatitude
-            if 'GPSLatitude' in tags:
-                lat_ref = tags.get('GPSLatitudeRef', '').values
-                lat_values = tags.get('GPSLatitude', '').values
+            if 'GPS GPSLatitude' in tags:
+                lat_ref = tags.get('GPS GPSLatitudeRef', '').values
+                lat_values = tags.get('GPS GPSLatitude', '').values
                 
                 if lat_values and len(lat_values) == 3:
                     # Convert DMS to decimal degrees
@@ -129,9 +127,9 @@ def extract_exif_coordinates(image_file) -> Tuple[Optional[float], Optional[floa
                     gps_lat = lat_decimal
             
             # GPSLongitude
-            if 'GPSLongitude' in tags:
-                lon_ref = tags.get('GPSLongitudeRef', '').values
-                lon_values = tags.get('GPSLongitude', '').values
+            if 'GPS GPSLongitude' in tags:
+                lon_ref = tags.get('GPS GPSLongitudeRef', '').values
+                lon_values = tags.get('GPS GPSLongitude', '').values
                 
                 if lon_values and len(lon_values) == 3:
                     # Convert DMS to decimal degrees
@@ -198,7 +196,7 @@ def infer_from_ocr(ocr_text: str) -> Tuple[Optional[float], Optional[float], Opt
     for place_name in sorted_places:
         # Use word boundary matching for better accuracy
         # This prevents "delhi" matching inside "delhi's"
-        pattern = r'\b' + re.escape(place_name) + r'\b?'
+        pattern = r'\b' + re.escape(place_name) + r'\b'
         if re.search(pattern, text_lower, re.IGNORECASE):
             place_info = KNOWN_PLACES[place_name]
             return (
@@ -230,9 +228,78 @@ def infer_from_ocr(ocr_text: str) -> Tuple[Optional[float], Optional[float], Opt
                     place_info["country"]
                 )
     
+    # Last resort: fuzzy match to tolerate OCR noise ("Mumbal", "Hyderabed")
+    candidates = rank_ocr_candidates(ocr_text, limit=1)
+    if candidates:
+        place_info = KNOWN_PLACES[candidates[0]["name"]]
+        return (
+            place_info["lat"],
+            place_info["lon"],
+            place_info["city"],
+            place_info["country"]
+        )
+    
     return (None, None, None, None)
 
 
+# Common English words never used as the first or last word of a fuzzy
+# lookup window ("of" may sit inside "gateway of india", not at its edge)
+STOP_WORDS = {
+    "a", "an", "and", "are", "at", "be", "by", "for", "from", "in", "is", "it",
+    "of", "on", "or", "the", "this", "that", "to", "was", "were", "with",
+    "about", "after", "before", "between", "could", "other", "should",
+    "their", "there", "these", "those", "under", "where", "which", "while",
+    "would", "people", "please", "service", "station", "street", "road",
+}
+
+
+@lru_cache(maxsize=1)
+def get_place_index() -> PlaceIndex:
+    """Build the fuzzy index over KNOWN_PLACES on first use."""
+    return PlaceIndex(KNOWN_PLACES.keys())
+
+
+def rank_ocr_candidates(ocr_text: str, limit: int = 5) -> List[dict]:
+    """
+    Rank known places that fuzzily match words in OCR text.
+    
+    Every run of 1..N consecutive words (N = longest place name in words)
+    is looked up in the deletion index, so cost grows with the text length,
+    not with the size of KNOWN_PLACES.
+    
+    Args:
+        ocr_text: Text extracted from image via OCR
+        limit: Maximum number of candidates
+        
+    Returns:
+        List of {"name", "text", "score", "city", "country", "lat", "lon"}
+        sorted by descending score (1.0 = exact match)
+    """
+    if not ocr_text or not ocr_text.strip():
+        return []
+    
+    index = get_place_index()
+    # Keep digits inside words: OCR often reads "o" as "0" or "l" as "1"
+    words = re.findall(r'[a-z0-9]+', ocr_text.lower())
+    best = {}
+    
+    for size in range(1, index.max_words + 1):
+        for start in range(len(words) - size + 1):
+            window = words[start:start + size]
+            if window[0] in STOP_WORDS or window[-1] in STOP_WORDS:
+                continue
+            if any(word.isdigit() for word in window):
+                continue
+            term = " ".join(window)
+            for name, score in index.lookup(term, limit):
+                if name not in best or score > best[name]["score"]:
+                    best[name] = {"name": name, "text": term, "score": score, **KNOWN_PLACES[name]}
+    
+    # Prefer higher scores, then longer (more specific) names
+    ranked = sorted(best.values(), key=lambda c: (-c["score"], -len(c["name"]), c["name"]))
+    return ranked[:limit]
+
+
 def infer_from_ip(ip_address: str) -> Tuple[Optional[float], Optional[float], Optional[str], Optional[str]]:
     """
     Infer location from IP address.
@@ -284,9 +351,12 @@ def reverse_geocode(lat: float, lon: float) -> Tuple[Optional[str], Optional[str
     if lat is None or lon is None:
         return (None, None)
     
-    if not GEOPY_AVAILABLE:
+    if not subsystems.load("geocoder"):
         return (None, None)
     
+    from geopy.geocoders import Nominatim
+    from geopy.exc import GeocoderTimedOut, GeocoderServiceError
+    
     try:
         geolocator = Nominatim(user_agent="osint_dashboard_v1", timeout=5)
         location = geolocator.reverse((lat, lon), exactly_one=True)
@@ -0,0 +1,189 @@
+"""
+Fuzzy Place Name Index
+OCR-noise-tolerant lookup of gazetteer names (e.g. "Mumbal" → "mumbai")
+
+SymSpell-style symmetric deletion index:
+- Every gazetteer name is indexed under all strings obtained by deleting
+  up to N characters from it (N depends on name length)
+- A query term generates its own deletes and looks them up, so candidate
+  generation costs O(len(term)^N) dictionary probes regardless of how many
+  names the gazetteer holds
+- Candidates are verified with a bounded edit distance and ranked by
+  similarity = 1 - distance / max(len(term), len(name))
+
+Substituting characters OCR commonly confuses ("i"/"l", "a"/"e", "0"/"o")
+costs half an edit, so "mumbal" → "mumbai" scores 0.92 while ordinary
+words one real edit away from a place ("merlin" / "berlin") stay below
+MIN_SIMILARITY. On top of the real edits its length allows, a term may
+take one such substitution, so short names ("delhl", "l0ndon") still
+match. Names of several words are also checked word by word, so "big men"
+or "new work" don't pass for "big ben" / "new york" on the strength of
+the long word next to them.
+
+Names and terms are indexed by their deletes after folding confusable
+characters together, so candidates that differ only by OCR confusions
+are found without spending the real-edit budget.
+"""
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Minimum similarity for a fuzzy candidate to be returned
+MIN_SIMILARITY = 0.85
+# One edit is tolerated per this many characters (shorter terms must match exactly)
+CHARS_PER_EDIT = 6
+MAX_EDITS = 2
+
+# Character pairs OCR engines commonly mistake for each other
+OCR_CONFUSIONS = {
+    frozenset(pair) for pair in (
+        "il", "ij", "lt", "ce", "ae", "ao", "uv", "hn", "0o", "1l", "1i", "5s"
+    )
+}
+CONFUSION_COST = 0.5
+
+
+def _confusion_folding() -> Dict[str, str]:
+    """Map every confusable character to one representative of its group."""
+    groups: List[Set[str]] = []
+    for pair in OCR_CONFUSIONS:
+        merged = set(pair)
+        for group in [g for g in groups if g & merged]:
+            merged |= group
+            groups.remove(group)
+        groups.append(merged)
+    return {char: min(group) for group in groups for char in group}
+
+
+FOLDING = _confusion_folding()
+
+
+def fold(term: str) -> str:
+    """Replace confusable characters by their group representative (index keys only)."""
+    return "".join(FOLDING.get(char, char) for char in term)
+
+
+def max_edit_distance(length: int) -> int:
+    """Real edits tolerated for a term of the given length."""
+    return min(length // CHARS_PER_EDIT, MAX_EDITS)
+
+
+def allowed_distance(a: str, b: str) -> float:
+    """Distance tolerated between two strings: their real edits plus one OCR confusion."""
+    return max_edit_distance(min(len(a), len(b))) + CONFUSION_COST
+
+
+def substitution_cost(a: str, b: str) -> float:
+    if a == b:
+        return 0.0
+    if frozenset((a, b)) in OCR_CONFUSIONS:
+        return CONFUSION_COST
+    return 1.0
+
+
+def generate_deletes(term: str, distance: int) -> Set[str]:
+    """Return the term plus every string reachable by deleting up to `distance` characters."""
+    deletes = {term}
+    frontier = {term}
+    for _ in range(distance):
+        next_frontier = set()
+        for word in frontier:
+            for i in range(len(word)):
+                next_frontier.add(word[:i] + word[i + 1:])
+        deletes |= next_frontier
+        frontier = next_frontier
+    return deletes
+
+
+def edit_distance(a: str, b: str, max_distance: float) -> float:
+    """
+    Optimal string alignment distance (Levenshtein + adjacent transpositions),
+    with OCR-confusable substitutions at CONFUSION_COST.
+
+    Returns max_distance + 1 as soon as the distance is known to exceed max_distance.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = substitution_cost(a[i - 1], b[j - 1])
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+def match_distance(term: str, name: str) -> Optional[float]:
+    """
+    Distance between a term and a name, or None if they are too far apart.
+
+    When both have the same number of words, every word must also be within
+    its own allowance, so a short word can't hide a real edit behind a long one.
+    """
+    allowed = allowed_distance(term, name)
+    distance = edit_distance(term, name, allowed)
+    if distance > allowed:
+        return None
+
+    term_words, name_words = term.split(), name.split()
+    if len(term_words) == len(name_words) > 1:
+        for term_word, name_word in zip(term_words, name_words):
+            word_allowed = allowed_distance(term_word, name_word)
+            if edit_distance(term_word, name_word, word_allowed) > word_allowed:
+                return None
+    return distance
+
+
+class PlaceIndex:
+    """Deletion index over gazetteer names for fuzzy lookup."""
+
+    def __init__(self, names: Iterable[str]):
+        self.names: Set[str] = set()
+        self.deletes: Dict[str, Set[str]] = {}
+        self.max_words = 1
+        for name in names:
+            self.add(name)
+
+    def add(self, name: str) -> None:
+        """Index a lowercase gazetteer name."""
+        self.names.add(name)
+        self.max_words = max(self.max_words, len(name.split()))
+        for delete in generate_deletes(fold(name), max_edit_distance(len(name))):
+            self.deletes.setdefault(delete, set()).add(name)
+
+    def lookup(self, term: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """
+        Find gazetteer names similar to a term.
+
+        Args:
+            term: Lowercase query (one or more words)
+            limit: Maximum number of candidates
+
+        Returns:
+            List of (name, similarity) sorted by descending similarity
+        """
+        if term in self.names:
+            return [(term, 1.0)]
+
+        candidates = set()
+        for delete in generate_deletes(fold(term), max_edit_distance(len(term))):
+            candidates |= self.deletes.get(delete, set())
+
+        results = []
+        for name in candidates:
+            distance = match_distance(term, name)
+            if distance is None:
+                continue
+            similarity = 1 - distance / max(len(term), len(name))
+            if similarity >= MIN_SIMILARITY:
+                results.append((name, round(similarity, 3)))
+
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return results[:limit]
@@ -0,0 +1,247 @@
+"""
+On-Demand Request Profiling
+Opt-in cProfile capture of single requests, saved under a request ID
+
+ENABLING (both off by default):
+- Header "X-Profile: 1" together with "X-Admin-Token: <OSINT_ADMIN_TOKEN>"
+- Sampling: OSINT_PROFILE_SAMPLE_EVERY=N profiles one request in N
+
+Profiles are written as pstats files to OSINT_PROFILE_DIR (default
+"profiles"), keeping at most OSINT_PROFILE_MAX_FILES (default 50) - the
+oldest are deleted first. Open them with `python -m pstats <file>` or
+snakeviz.
+
+Profiles are named after the request's X-Request-ID when the request is
+admin-authenticated, and get a random ID otherwise (returned in
+X-Profile-Id), so anonymous clients cannot overwrite saved profiles.
+
+Only one request is profiled at a time. cProfile hooks the event loop
+thread, so coroutines of other requests interleaving with the profiled one
+show up too. Before Python 3.12, work offloaded with run_in_threadpool()
+below is profiled in its worker thread and merged into the same file; from
+3.12 cProfile is built on sys.monitoring, which already sees every thread
+and allows only one active profiler.
+
+ProfilingMiddleware is plain ASGI. With no admin token configured and
+sampling disabled it passes requests straight through; otherwise the cost
+of an unprofiled request is reading two headers and a counter increment.
+"""
+
+import contextvars
+import cProfile
+import hmac
+import itertools
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import uuid
+from typing import Callable, List, Optional
+
+from fastapi.concurrency import run_in_threadpool as _run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+ADMIN_TOKEN = os.environ.get("OSINT_ADMIN_TOKEN", "")
+SAMPLE_EVERY = int(os.environ.get("OSINT_PROFILE_SAMPLE_EVERY", "0"))
+PROFILE_DIR = os.environ.get("OSINT_PROFILE_DIR", "profiles")
+MAX_FILES = int(os.environ.get("OSINT_PROFILE_MAX_FILES", "50"))
+
+PROFILE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+# From 3.12 cProfile uses the process-wide sys.monitoring: a profile enabled
+# on the event loop thread covers worker threads, and a second one can't start
+PER_THREAD_PROFILES = sys.version_info < (3, 12)
+
+_counter = itertools.count(1)
+_lock = threading.Lock()
+_active: contextvars.ContextVar[Optional["ProfileSession"]] = contextvars.ContextVar("profile_session", default=None)
+
+
+class ProfileSession:
+    """cProfile state for one request: the event loop profile plus worker thread profiles."""
+
+    def __init__(self, profile_id: str):
+        self.profile_id = profile_id
+        self.main = cProfile.Profile()
+        self.workers: List[cProfile.Profile] = []
+
+
+def is_admin(token: Optional[str]) -> bool:
+    if not ADMIN_TOKEN or token is None:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8"))
+
+
+def is_enabled() -> bool:
+    """Return False if no request can be profiled (no admin token and no sampling)."""
+    return bool(ADMIN_TOKEN) or SAMPLE_EVERY > 0
+
+
+def should_profile(headers) -> bool:
+    """Decide whether to profile a request from its headers or the sampling counter."""
+    if headers.get("x-profile") == "1" and is_admin(headers.get("x-admin-token")):
+        return True
+    return SAMPLE_EVERY > 0 and next(_counter) % SAMPLE_EVERY == 0
+
+
+def new_profile_id(headers) -> str:
+    """Use the request's X-Request-ID if it comes from an admin, otherwise a random ID."""
+    request_id = headers.get("x-request-id")
+    if request_id and PROFILE_ID_PATTERN.match(request_id) and is_admin(headers.get("x-admin-token")):
+        return request_id
+    return uuid.uuid4().hex
+
+
+def start(profile_id: str) -> Optional[ProfileSession]:
+    """Start profiling on the current thread, or return None if another request is being profiled."""
+    if not _lock.acquire(blocking=False):
+        return None
+    session = ProfileSession(profile_id)
+    try:
+        session.main.enable()
+    except ValueError as e:
+        # Another profiler (debugger, coverage, a sys.monitoring tool) is active
+        _lock.release()
+        print(f"Request profiling skipped: {e}")
+        return None
+    _active.set(session)
+    return session
+
+
+def stop(session: ProfileSession, metadata: dict) -> Optional[str]:
+    """
+    Stop profiling, save the profile and its metadata, and return the profile path.
+
+    Returns None if the profile could not be written (full disk, read-only
+    PROFILE_DIR); the request it belongs to is not affected.
+    """
+    try:
+        session.main.disable()
+        _active.set(None)
+
+        stats = pstats.Stats(session.main)
+        for worker in session.workers:
+            stats.add(worker)
+
+        path = os.path.join(PROFILE_DIR, f"{session.profile_id}.prof")
+        try:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            stats.dump_stats(path)
+            with open(os.path.join(PROFILE_DIR, f"{session.profile_id}.json"), "w", encoding="utf-8") as f:
+                json.dump({"id": session.profile_id, "created": time.time(), **metadata}, f)
+        except OSError as e:
+            print(f"Could not save profile {session.profile_id}: {e}")
+            return None
+
+        try:
+            _evict()
+        except OSError as e:
+            print(f"Could not evict old profiles: {e}")
+        return path
+    finally:
+        _lock.release()
+
+
+async def run_in_threadpool(func: Callable, *args):
+    """Like fastapi.concurrency.run_in_threadpool, but profiles func if the request is profiled."""
+    session = _active.get()
+    if session is None or not PER_THREAD_PROFILES:
+        return await _run_in_threadpool(func, *args)
+    return await _run_in_threadpool(_call_profiled, session, func, *args)
+
+
+def _call_profiled(session: ProfileSession, func: Callable, *args):
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # Profiling must never fail the request: run unprofiled instead
+        return func(*args)
+    try:
+        return func(*args)
+    finally:
+        profile.disable()
+        session.workers.append(profile)
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling requests asked for by an admin header or selected by sampling.
+
+    Admin endpoints are never profiled. The profile ID is returned in the
+    X-Profile-Id response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or not is_enabled()
+                or scope["path"].startswith("/admin/")):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        if not should_profile(headers):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = new_profile_id(headers)
+        session = start(profile_id)
+        if session is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-Id", profile_id)
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            stop(session, {
+                "method": scope["method"],
+                "path": scope["path"],
+                "durationMs": round((time.perf_counter() - started) * 1000, 1)
+            })
+
+
+def _evict() -> None:
+    """Delete the oldest profiles beyond MAX_FILES."""
+    profiles = list_profiles()
+    for entry in profiles[MAX_FILES:]:
+        for ext in (".prof", ".json"):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, entry["id"] + ext))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles() -> List[dict]:
+    """Return metadata of saved profiles, newest first."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+
+    profiles = []
+    for filename in os.listdir(PROFILE_DIR):
+        if not filename.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(PROFILE_DIR, filename), encoding="utf-8") as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    profiles.sort(key=lambda p: p.get("created", 0), reverse=True)
+    return profiles
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    """Return the path of a saved profile, or None if it doesn't exist."""
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.prof")
+    return path if os.path.exists(path) else None
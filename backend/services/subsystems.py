@@ -0,0 +1,104 @@
+"""
+Lazy Subsystem Loader
+Defers heavy imports (OpenCV/DNN, the EXIF stack, geocoders) until first use
+
+SUBSYSTEMS:
+- vision    → cv2, numpy, human detection (+ MobileNet-SSD model), manipulation
+- exif      → PIL, exifread, services.location
+- geocoder  → geopy
+- elevation → numpy, services.elevation
+
+Importing main.py only pulls in FastAPI, so /health and the coordinate
+endpoints answer without paying for OpenCV. Each subsystem is imported
+once, on first use or by the background warm-up started with the server,
+and the time it took is recorded for /health and check_startup.py.
+"""
+
+import importlib
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+SUBSYSTEMS = {
+    "vision": ("numpy", "cv2", "services.human_detection", "services.manipulation"),
+    "exif": ("PIL.Image", "exifread", "services.location"),
+    "geocoder": ("geopy.geocoders", "geopy.exc"),
+    "elevation": ("numpy", "services.elevation"),
+}
+
+# Set OSINT_WARM_SUBSYSTEMS=0 to skip the background warm-up (e.g. in
+# short-lived workers that only serve coordinate lookups)
+WARM_ON_STARTUP = os.environ.get("OSINT_WARM_SUBSYSTEMS", "1") != "0"
+
+# One lock per subsystem, so loading a light subsystem never waits for the
+# warm-up thread importing cv2 (shared modules like numpy are serialized by
+# Python's own per-module import locks)
+_locks = {name: threading.Lock() for name in SUBSYSTEMS}
+_loaded: Dict[str, bool] = {}
+_timings: Dict[str, float] = {}
+
+
+def load(name: str) -> bool:
+    """
+    Import every module of a subsystem on first call.
+
+    Args:
+        name: Subsystem name, one of SUBSYSTEMS
+
+    Returns:
+        True if all modules imported, False if a dependency is missing
+    """
+    if name in _loaded:
+        return _loaded[name]
+
+    with _locks[name]:
+        if name in _loaded:
+            return _loaded[name]
+
+        start = time.perf_counter()
+        available = True
+        for module_name in SUBSYSTEMS[name]:
+            try:
+                importlib.import_module(module_name)
+            except ImportError as e:
+                print(f"Subsystem '{name}' unavailable: {e}")
+                available = False
+                break
+
+        _timings[name] = round((time.perf_counter() - start) * 1000, 1)
+        _loaded[name] = available
+        return available
+
+
+def is_loaded(name: str) -> bool:
+    """Return True if the subsystem has already been imported successfully."""
+    return _loaded.get(name, False)
+
+
+def timings() -> Dict[str, Optional[float]]:
+    """Return import time in milliseconds per subsystem (None if not loaded yet)."""
+    return {name: _timings.get(name) for name in SUBSYSTEMS}
+
+
+def warm() -> None:
+    """Load every subsystem and the human detection model."""
+    for name in SUBSYSTEMS:
+        load(name)
+
+    if is_loaded("vision"):
+        from services.human_detection import load_model
+        try:
+            load_model()
+        except Exception as e:
+            print(f"Model warm-up skipped: {e}")
+
+
+def start_background_warmup() -> Optional[threading.Thread]:
+    """Warm subsystems in a daemon thread so the server can take traffic immediately."""
+    if not WARM_ON_STARTUP:
+        return None
+
+    thread = threading.Thread(target=warm, name="subsystem-warmup", daemon=True)
+    thread.start()
+    return thread
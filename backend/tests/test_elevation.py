@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from services import elevation
+
+
+@pytest.fixture
+def dem(monkeypatch, tmp_path):
+    monkeypatch.setattr(elevation, "DEM_DIR", str(tmp_path))
+    monkeypatch.setattr(elevation, "MAX_OPEN_TILES", 2)
+    monkeypatch.setattr(elevation, "_tiles", elevation.OrderedDict())
+    monkeypatch.setattr(elevation, "_missing", {})
+    return tmp_path
+
+
+def _write_tile(directory, lat_floor, lon_floor, height):
+    path = directory / elevation.tile_name(lat_floor, lon_floor)
+    np.full((1201, 1201), height, dtype=">i2").tofile(path)
+
+
+def test_missing_tiles_do_not_evict_open_tiles(dem):
+    _write_tile(dem, 28, 77, 200)
+    _write_tile(dem, 19, 72, 10)
+    assert elevation.get_elevation(28.5, 77.5) == 200.0
+    assert elevation.get_elevation(19.5, 72.5) == 10.0
+
+    # Open ocean: many lookups without tiles on disk
+    for lon in range(-40, -20):
+        assert elevation.get_elevation(0.5, lon + 0.5) is None
+
+    assert list(elevation._tiles) == [(28, 77), (19, 72)]
+
+
+def test_tile_added_later_is_picked_up(dem, monkeypatch):
+    assert elevation.get_elevation(28.5, 77.5) is None
+    _write_tile(dem, 28, 77, 200)
+    # Still within the negative-cache TTL
+    assert elevation.get_elevation(28.5, 77.5) is None
+
+    monkeypatch.setattr(elevation, "_missing", {key: 0.0 for key in elevation._missing})
+    assert elevation.get_elevation(28.5, 77.5) == 200.0
+
+
+def _write_gradient_tile(directory, lat_floor, lon_floor, size=1201):
+    """Tile whose height is row + 2 * col, so interpolation errors and flips show up."""
+    rows, cols = np.mgrid[0:size, 0:size]
+    tile = (rows + 2 * cols).astype(">i2")
+    tile.tofile(directory / elevation.tile_name(lat_floor, lon_floor))
+    return tile
+
+
+def _point(lat_floor, lon_floor, row, col, n=1200):
+    """Coordinates of a (fractional) grid position; row 0 is the northern edge."""
+    return lat_floor + 1 - row / n, lon_floor + col / n
+
+
+@pytest.mark.parametrize("row, col", [(600, 300), (600.5, 300.25), (1, 1199), (1199.75, 0.5)])
+def test_bilinear_interpolation_on_gradient(dem, row, col):
+    _write_gradient_tile(dem, 28, 77)
+    lat, lon = _point(28, 77, row, col)
+    assert elevation.get_elevation(lat, lon) == pytest.approx(row + 2 * col, abs=0.05)
+
+
+def test_southern_western_tile(dem):
+    _write_gradient_tile(dem, -34, -71)
+    assert elevation.tile_name(-34, -71) == "S34W071.hgt"
+    lat, lon = _point(-34, -71, 300, 900)
+    assert (lat, lon) == (-33.25, -70.25)
+    assert elevation.get_elevation(lat, lon) == pytest.approx(2100)
+
+
+def test_void_neighbours_are_renormalized(dem):
+    tile = _write_gradient_tile(dem, 28, 77)
+    tile[600, 300] = elevation.VOID
+    tile.tofile(dem / elevation.tile_name(28, 77))
+
+    # Halfway between (600, 299) and the void (600, 300): only the valid one counts
+    assert elevation.get_elevation(*_point(28, 77, 600, 299.5)) == pytest.approx(1198)
+    # Exactly on the void (28.5, 77.25): mean of the other three neighbours
+    assert elevation.get_elevation(28.5, 77.25) == pytest.approx((1202 + 1201 + 1203) / 3, abs=0.05)
+
+
+def test_points_on_north_and_east_edges_use_the_containing_tile(dem):
+    _write_gradient_tile(dem, 28, 77)
+    assert elevation.get_elevation(29.0, 77.5) == pytest.approx(1200)
+    assert elevation.get_elevation(28.5, 78.0) == pytest.approx(600 + 2400)
+    assert elevation.get_elevation(29.0, 78.0) == pytest.approx(2400)
+    assert elevation.get_elevation(28.0, 77.0) == pytest.approx(1200)
+
+
+def test_batched_lookup_fetches_each_tile_once(dem, monkeypatch):
+    _write_gradient_tile(dem, 28, 77)
+    _write_gradient_tile(dem, -34, -71)
+    fetched = []
+    get_tile = elevation.get_tile
+    monkeypatch.setattr(elevation, "get_tile", lambda *key: fetched.append(key) or get_tile(*key))
+
+    lats = [28.5, -33.25, 28.25, 10.5, -33.5]
+    lons = [77.25, -70.25, 77.5, 10.5, -70.5]
+    heights = elevation.get_elevations(lats, lons)
+
+    np.testing.assert_allclose(heights[[0, 1, 2, 4]], [1200, 2100, 900 + 1200, 600 + 1200])
+    assert np.isnan(heights[3])
+    assert sorted(fetched) == [(-34, -71), (10, 10), (28, 77)]
@@ -0,0 +1,177 @@
+import glob
+import io
+import json
+import os
+import struct
+import tarfile
+import zipfile
+
+import pytest
+from PIL import Image
+
+import ingest
+
+
+def _jpeg(gps=None):
+    image = Image.new("RGB", (8, 8))
+    exif = Image.Exif()
+    if gps:
+        lat, lon = gps
+        exif[0x8825] = {1: "N", 2: (float(lat), 0.0, 0.0), 3: "E", 4: (float(lon), 0.0, 0.0)}
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+def _patch_zip_member(path, name, method=None, flags=None):
+    """Rewrite a member's compression method / flag bits in its local and central headers."""
+    data = bytearray(open(path, "rb").read())
+    encoded = name.encode()
+    # (signature, flags offset, method offset, name length offset, name offset)
+    headers = ((b"PK\x03\x04", 6, 8, 26, 30), (b"PK\x01\x02", 8, 10, 28, 46))
+    for signature, flags_at, method_at, name_length_at, name_at in headers:
+        start = data.find(signature)
+        while start != -1:
+            name_length = struct.unpack_from("<H", data, start + name_length_at)[0]
+            if data[start + name_at:start + name_at + name_length] == encoded:
+                if method is not None:
+                    struct.pack_into("<H", data, start + method_at, method)
+                if flags is not None:
+                    struct.pack_into("<H", data, start + flags_at, flags)
+            start = data.find(signature, start + 1)
+    open(path, "wb").write(bytes(data))
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    evidence = tmp_path / "evidence"
+    (evidence / "sub").mkdir(parents=True)
+    (evidence / "a.jpg").write_bytes(_jpeg(gps=(28, 77)))
+    (evidence / "b.jpg").write_bytes(_jpeg())
+    (evidence / "b.txt").write_text("Greetings from Mumbai")
+    (evidence / "c.png").write_bytes(b"not really a png")
+    (evidence / "notes.txt").write_text("not an image")
+    (evidence / "sub" / "d.jpg").write_bytes(_jpeg())
+
+    archive = str(tmp_path / "dump.zip")
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("gps.jpg", _jpeg(gps=(19, 72)))
+        zf.writestr("deflate64.jpg", _jpeg())
+        zf.writestr("x.jpg", _jpeg())
+        zf.writestr("x.txt", "Taken in Bengaluru")
+        zf.writestr("encrypted.jpg", _jpeg())
+    _patch_zip_member(archive, "deflate64.jpg", method=9)
+    _patch_zip_member(archive, "encrypted.jpg", flags=1)
+
+    tarball = str(tmp_path / "dump.tar.gz")
+    with tarfile.open(tarball, "w:gz") as tf:
+        for name in ("t1.jpg", "t2.jpg"):
+            data = _jpeg()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+
+    truncated = str(tmp_path / "broken.tar.gz")
+    with open(tarball, "rb") as f:
+        head = f.read()
+    with open(truncated, "wb") as f:
+        f.write(head[:20])
+
+    return [str(evidence), archive, tarball, truncated]
+
+
+def _run(inputs, out, *extra):
+    args = [*inputs, "--out", str(out), "--workers", "1", "--chunk-size", "2", "--batch-size", "2", *extra]
+    assert ingest.main(args) == 0
+
+
+def _rows(out):
+    rows = []
+    for path in sorted(glob.glob(os.path.join(str(out), "part-*.jsonl"))):
+        with open(path, encoding="utf-8") as f:
+            rows.extend(json.loads(line) for line in f)
+    return rows
+
+
+def _short(path, root):
+    """Path relative to root, keeping the "!member" suffix of archive entries."""
+    source, bang, member = path.partition("!")
+    return os.path.relpath(source, str(root)).replace(os.sep, "/") + bang + member
+
+
+def test_walks_directories_and_archives_in_order(inputs, tmp_path):
+    out = tmp_path / "out"
+    _run(inputs, out)
+    rows = {_short(row["path"], tmp_path): row for row in _rows(out)}
+
+    assert list(rows) == [
+        "evidence/a.jpg", "evidence/b.jpg", "evidence/c.png", "evidence/sub/d.jpg",
+        "dump.zip!gps.jpg", "dump.zip!deflate64.jpg", "dump.zip!x.jpg", "dump.zip!encrypted.jpg",
+        "dump.tar.gz!t1.jpg", "dump.tar.gz!t2.jpg",
+        "broken.tar.gz",
+    ]
+
+    assert rows["evidence/a.jpg"]["location"]["source"] == "EXIF"
+    assert rows["evidence/a.jpg"]["location"]["latitude"] == pytest.approx(28.0)
+    assert rows["dump.zip!gps.jpg"]["location"]["source"] == "EXIF"
+    # Sidecars are paired by stem, in directories and zip archives
+    assert rows["evidence/b.jpg"]["location"]["city"] == "Mumbai"
+    assert rows["dump.zip!x.jpg"]["location"]["city"] == "Bengaluru"
+    assert rows["evidence/c.png"]["location"]["source"] == "none"
+
+    # Unreadable members and archives become error rows
+    assert rows["dump.zip!deflate64.jpg"]["error"].startswith("NotImplementedError")
+    assert rows["dump.zip!encrypted.jpg"]["error"].startswith("RuntimeError")
+    assert rows["broken.tar.gz"]["error"]
+    assert all(row["error"] is None for name, row in rows.items()
+               if name not in ("dump.zip!deflate64.jpg", "dump.zip!encrypted.jpg", "broken.tar.gz"))
+
+    checkpoint = json.loads((out / ingest.CHECKPOINT_FILE).read_text())
+    assert checkpoint["processed"] == 11
+    assert checkpoint["parts"] == 6
+    assert sorted(os.listdir(out)) == [ingest.CHECKPOINT_FILE] + [f"part-{i:05d}.jsonl" for i in range(6)]
+
+
+class Interrupted(Exception):
+    pass
+
+
+def test_resume_neither_duplicates_nor_loses_rows(inputs, tmp_path, monkeypatch):
+    reference = tmp_path / "reference"
+    _run(inputs, reference)
+    expected = [row["path"] for row in _rows(reference)]
+
+    out = tmp_path / "out"
+    flush = ingest.ChunkWriter.flush
+    calls = []
+
+    def flaky_flush(self):
+        calls.append(1)
+        if len(calls) == 3:
+            raise Interrupted()
+        flush(self)
+
+    monkeypatch.setattr(ingest.ChunkWriter, "flush", flaky_flush)
+    with pytest.raises(Interrupted):
+        _run(inputs, out)
+    monkeypatch.setattr(ingest.ChunkWriter, "flush", flush)
+
+    assert json.loads((out / ingest.CHECKPOINT_FILE).read_text())["processed"] == 4
+
+    # Skipped entries are not read again
+    reads = []
+    load_entry = ingest.load_entry
+    monkeypatch.setattr(ingest, "load_entry", lambda entry: reads.append(entry[0]) or load_entry(entry))
+    _run(inputs, out, "--resume")
+
+    assert reads == expected[4:]
+    assert [row["path"] for row in _rows(out)] == expected
+    assert json.loads((out / ingest.CHECKPOINT_FILE).read_text()) == \
+        json.loads((reference / ingest.CHECKPOINT_FILE).read_text())
+
+
+def test_resume_rejects_other_inputs(inputs, tmp_path):
+    out = tmp_path / "out"
+    _run(inputs[:1], out)
+    with pytest.raises(SystemExit):
+        _run(inputs, out, "--resume")
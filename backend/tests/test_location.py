@@ -0,0 +1,47 @@
+import pytest
+
+from services.location import infer_from_ocr, rank_ocr_candidates
+
+
+@pytest.mark.parametrize("ocr_text, city", [
+    ("Mumbal", "Mumbai"),
+    ("Bengalur", "Bengaluru"),
+    ("Hyderabed", "Hyderabad"),
+    ("Welcome to Bengalur station", "Bengaluru"),
+    ("Gatewey of lndia", "Mumbai"),
+    ("L0ndon", "London"),
+    ("Mumba1", "Mumbai"),
+    ("5urat", "Surat"),
+    ("Delhl", "Delhi"),
+    ("Dubal", "Dubai"),
+    ("Tokyo 2024", "Tokyo"),
+])
+def test_fuzzy_match_tolerates_ocr_noise(ocr_text, city):
+    assert infer_from_ocr(ocr_text)[2] == city
+
+
+@pytest.mark.parametrize("ocr_text", [
+    "parts",
+    "pairs",
+    "patina",
+    "spare parts",
+    "pairs of shoes",
+    "parish church",
+    "copper patina",
+    "merlin the wizard",
+    "sidney sheldon",
+    "big men",
+    "big bed",
+    "a big hen",
+    "new work",
+    "pume",
+])
+def test_fuzzy_match_ignores_ordinary_words(ocr_text):
+    assert infer_from_ocr(ocr_text) == (None, None, None, None)
+    assert rank_ocr_candidates(ocr_text) == []
+
+
+def test_exact_match_scores_one():
+    candidates = rank_ocr_candidates("Taken near India Gate, Delhi")
+    assert candidates[0]["score"] == 1.0
+    assert {c["name"] for c in candidates} >= {"india gate", "delhi"}
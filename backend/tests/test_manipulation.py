@@ -0,0 +1,75 @@
+import cv2
+import numpy as np
+import pytest
+
+from services.manipulation import analyze_manipulation
+
+
+def _jpeg(image, quality):
+    ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    assert ok
+    return cv2.imdecode(encoded, cv2.IMREAD_COLOR)
+
+
+def _photo(seed=0, size=1024):
+    """Photo-like texture: detail at several scales plus sensor noise."""
+    rng = np.random.default_rng(seed)
+    image = np.zeros((size, size, 3), np.float32)
+    for cells, amplitude in ((4, 60), (32, 30), (256, 20)):
+        layer = rng.uniform(-amplitude, amplitude, (cells, cells, 3)).astype(np.float32)
+        image += cv2.resize(layer, (size, size), interpolation=cv2.INTER_CUBIC)
+    image += 128 + rng.normal(0, 3, image.shape)
+    return image.clip(0, 255).astype(np.uint8)
+
+
+def _splice(original, quality):
+    """Paste an uncompressed 200x200 patch into a JPEG of the same scene."""
+    forged = _jpeg(original, quality)
+    forged[400:600, 560:760] = original[400:600, 560:760]
+    return forged
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_clean_jpeg_scores_zero(seed):
+    original = _photo(seed)
+    assert analyze_manipulation(_jpeg(original, 60))["manipulationScore"] < 0.1
+    assert analyze_manipulation(_jpeg(_jpeg(original, 60), 92))["manipulationScore"] < 0.1
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_splice_into_q60_jpeg_is_flagged(seed):
+    result = analyze_manipulation(_splice(_photo(seed), 60))
+    assert result["manipulationScore"] > 0.5
+    assert result["elaScore"] > 0.5
+    assert result["quantizationScore"] > 0.5
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_splice_survives_q92_resave(seed):
+    result = analyze_manipulation(_jpeg(_splice(_photo(seed), 60), 92))
+    assert result["elaScore"] > 0.5
+
+    # The heatmap peaks over the pasted patch (rows 400-600, cols 560-760 of 1024)
+    heatmap = np.array(result["heatmap"])
+    row, col = np.unravel_index(heatmap.argmax(), heatmap.shape)
+    assert 11 <= row <= 19 and 16 <= col <= 24
+
+
+def test_strips_match_a_single_pass():
+    # 1000 rows: the last strip is not a multiple of the 16-row strip height
+    image = _splice(_photo(), 60)[:1000]
+    whole = analyze_manipulation(image, strip_pixels=10**9)
+    assert analyze_manipulation(image, strip_pixels=100_000) == whole
+    assert analyze_manipulation(image, strip_pixels=1) == whole
+
+
+def test_splice_at_the_edge_of_a_large_image_is_flagged():
+    original = _photo(size=2048)
+    forged = _jpeg(original, 60)
+    forged[-200:, -200:] = original[-200:, -200:]
+    result = analyze_manipulation(forged, strip_pixels=1_000_000)
+    assert result["manipulationScore"] > 0.5
+
+    heatmap = np.array(result["heatmap"])
+    row, col = np.unravel_index(heatmap.argmax(), heatmap.shape)
+    assert row >= 28 and col >= 28
@@ -0,0 +1,85 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from services import profiling
+
+ADMIN = {"X-Admin-Token": "secret", "X-Profile": "1"}
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(profiling, "SAMPLE_EVERY", 0)
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    return TestClient(main.app)
+
+
+def test_disabled_profiling_passes_through(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "ADMIN_TOKEN", "")
+    response = client.get("/health", headers=ADMIN)
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+    assert os.listdir(tmp_path) == []
+
+
+def test_admin_request_is_profiled_under_its_request_id(client, tmp_path):
+    response = client.get("/health", headers={**ADMIN, "X-Request-ID": "req-1"})
+    assert response.status_code == 200
+    assert response.headers["x-profile-id"] == "req-1"
+    assert profiling.profile_path("req-1") == os.path.join(str(tmp_path), "req-1.prof")
+
+
+def test_wrong_admin_token_is_not_profiled(client):
+    response = client.get("/health", headers={"X-Admin-Token": "guess", "X-Profile": "1"})
+    assert "x-profile-id" not in response.headers
+
+
+def test_sampled_anonymous_request_cannot_choose_profile_id(client, monkeypatch):
+    client.get("/health", headers={**ADMIN, "X-Request-ID": "req-1"})
+    monkeypatch.setattr(profiling, "SAMPLE_EVERY", 1)
+
+    response = client.get("/health", headers={"X-Request-ID": "req-1"})
+    assert response.headers["x-profile-id"] != "req-1"
+    assert [p["path"] for p in profiling.list_profiles()] == ["/health", "/health"]
+
+
+def test_profiler_conflict_never_fails_the_request(client, monkeypatch):
+    class BusyProfile:
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(profiling.cProfile, "Profile", BusyProfile)
+    response = client.get("/health", headers=ADMIN)
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+
+    session = profiling.ProfileSession.__new__(profiling.ProfileSession)
+    session.workers = []
+    assert profiling._call_profiled(session, sum, [1, 2]) == 3
+    assert session.workers == []
+
+
+def test_failing_profile_save_never_fails_the_request(client, monkeypatch, tmp_path):
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(blocker / "profiles"))
+    response = client.get("/health", headers=ADMIN)
+    assert response.status_code == 200
+
+    # The profiling lock was released: the next request is profiled again
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    response = client.get("/health", headers=ADMIN)
+    assert profiling.profile_path(response.headers["x-profile-id"])
+
+
+def test_failing_eviction_keeps_the_saved_profile(client, monkeypatch):
+    def broken_evict():
+        raise PermissionError("read-only")
+
+    monkeypatch.setattr(profiling, "_evict", broken_evict)
+    response = client.get("/health", headers=ADMIN)
+    assert response.status_code == 200
+    assert profiling.profile_path(response.headers["x-profile-id"])
@@ -0,0 +1,38 @@
+import asyncio
+import threading
+
+import httpx
+
+import check_startup
+import main
+from services import subsystems
+
+
+def test_cold_start_stays_light():
+    assert check_startup.main([]) == 0
+
+
+def test_slow_subsystem_import_does_not_block_the_event_loop(monkeypatch):
+    release = threading.Event()
+
+    def slow_load(name):
+        release.wait(5)
+        return False
+
+    monkeypatch.setattr(subsystems, "load", slow_load)
+    monkeypatch.setattr(subsystems, "is_loaded", lambda name: False)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            pending = asyncio.create_task(client.get("/verify-location", params={"lat": 0, "lon": 0}))
+            await asyncio.sleep(0.1)
+
+            health = await asyncio.wait_for(client.get("/health"), timeout=2)
+            assert health.status_code == 200
+            assert not pending.done()
+
+            release.set()
+            assert (await pending).status_code == 200
+
+    asyncio.run(scenario())